@@ -7,19 +7,38 @@
 Convenience functions for munging of metadata and feedlogs.
 """
 
+from functools import lru_cache as _lru_cache
+from math import nan as _nan
 
 
-def metadata(path_to_csv):
+
+def read_csv(path_to_csv, fast_io=False, dtype=None):
+    """
+    Reads in a CSV from an ESPRESSO experiment as a pandas DataFrame.
+
+    If `fast_io` is True and pyarrow is installed, the CSV is parsed with
+    pyarrow's multithreaded reader; otherwise the default pandas reader is
+    used. `dtype` is passed on to `pandas.read_csv`.
+    """
+    from importlib.util import find_spec
+    import pandas as pd
+
+    if fast_io and find_spec('pyarrow') is not None:
+        return pd.read_csv(path_to_csv, engine='pyarrow', dtype=dtype)
+    return pd.read_csv(path_to_csv, dtype=dtype)
+
+
+
+def metadata(path_to_csv, fast_io=False):
     """
     Munges a metadata CSV from an ESPRESSO experiment.
     Returns a pandas DataFrame.
     """
     import os
     from numpy import repeat as nprepeat
-    from pandas import read_csv
 
     # Read in metadata.
-    metadata_csv = read_csv(path_to_csv)
+    metadata_csv = read_csv(path_to_csv, fast_io=fast_io)
     # Remove all columns that have all values missing.
     metadata_csv.dropna(axis=1, how='all', inplace=True)
     # Check that the metadata has a nonzero number of rows.
@@ -63,15 +82,19 @@ def metadata(path_to_csv):
 
 
 
-def feedlog(path_to_csv):
+def feedlog(path_to_csv, fast_io=False):
     """
     Munges a feedlog CSV from an ESPRESSO experiment.
     Returns a pandas DataFrame.
     """
-    from pandas import read_csv
-
-    # Read in the CSV.
-    feedlog_csv = read_csv(path_to_csv)
+    # Read in the CSV. The types of these columns are known, so spare
+    # pandas from inferring them. Integer columns are left out, as a row
+    # with a blank in them has to be read as float.
+    feedlog_dtypes = {'RelativeTime-s': 'float64', 'Duration-ms': 'float64',
+                      'Volume-mm3': 'float64',
+                      'AviFile': str, 'ExperimentState': str}
+    feedlog_csv = read_csv(path_to_csv, fast_io=fast_io,
+                           dtype=feedlog_dtypes)
 
     # Rename columns.
     feedlog_csv.rename(columns={"FlyID"             :    "ChamberID",
@@ -124,40 +147,35 @@ def add_padrows(metadata, feedlog, time_end, time_start=0):
     after the experiment was concluded.
     """
 
-    from numpy import nan as npnan
-    from numpy import repeat
-    from pandas import Series, DataFrame
-
-    f = feedlog.copy()
+    import numpy as np
+    import pandas as pd
 
-    feed_cols = f.columns
-    ncols = len(feed_cols)
     end_time = time_end + 289 # 289 seconds = 4 min, 49 sec.
 
-    all_padrows = []
-
-    for chamberid in metadata.ChamberID.unique():
-        for choice in feedlog.FoodChoice.unique().tolist():
-
-            padrow1 = Series(repeat(npnan, ncols), index=feed_cols)
-            padrow2 = Series(repeat(npnan, ncols), index=feed_cols)
-
-            padrow1.loc['RelativeTime_s'] = time_start + 0.5
-            padrow2.loc['RelativeTime_s'] = end_time
+    chamberids = metadata.ChamberID.unique()
+    # An array, or a Categorical if FoodChoice is one; taking from it keeps
+    # the dtype (and categories) of FoodChoice in the padrows.
+    choices = feedlog.FoodChoice.unique()
 
-            padrows = [padrow1, padrow2]
+    # For each ChamberID, for each food choice, a padrow at the start and
+    # a padrow at the end.
+    n_padrows = len(chamberids) * len(choices) * 2
+    choice_idx = np.tile(np.repeat(np.arange(len(choices)), 2),
+                         len(chamberids))
+    padrows = pd.DataFrame({
+        'RelativeTime_s': np.tile([time_start + 0.5, end_time],
+                                  n_padrows // 2),
+        'FoodChoice': choices.take(choice_idx),
+        'ChamberID': np.repeat(chamberids, len(choices) * 2),
+        'Valid': np.zeros(n_padrows, dtype=bool),
+        'ExperimentState': np.full(n_padrows, 'PAD', dtype=object)
+        })
 
-            for padrow in padrows:
-                padrow.loc['FoodChoice'] = choice
-                padrow.loc['ChamberID'] = chamberid
-                padrow.loc['Valid'] = False
-                padrow.loc['ExperimentState'] = 'PAD'
+    # padrows['AverageFeedVolumePerFly_µl'] = 0
+    # padrows['AverageFeedCountPerFly'] = 0
 
-                # padrow.loc['AverageFeedVolumePerFly_µl'] = 0
-                # padrow.loc['AverageFeedCountPerFly'] = 0
-
-            all_padrows = all_padrows + padrows
-    return f.append(all_padrows, ignore_index=True, sort=False)
+    padrows = padrows.reindex(columns=feedlog.columns)
+    return pd.concat([feedlog, padrows], ignore_index=True, sort=False)
 
 
 
@@ -243,6 +261,50 @@ def average_feed_speed_per_fly(df):
 
 
 
+def chamber_ids(ids, datetime_exptname):
+    """
+    Returns the ChamberIDs ("<datetime_exptname>_Chamber<ID>") for the Series
+    of chamber numbers `ids`. Each distinct number is formatted only once,
+    then mapped onto every row.
+    """
+    names = {i: '{}_Chamber{}'.format(datetime_exptname, i)
+             for i in ids.unique()}
+    return ids.map(names)
+
+
+
+def munge_feedlog_and_metadata(folder, feedlog_name, fast_io=False):
+    """
+    Reads in and munges the FeedLog `feedlog_name` in `folder`, together
+    with its corresponding MetaData. See `read_csv` for `fast_io`.
+
+    Returns the munged metadata, the munged feedlog, and a list of the
+    non-feeding flies in this feedlog.
+    """
+    import os
+
+    datetime_exptname = '_'.join(feedlog_name.strip('.csv').split('_')[1:3])
+
+    # Read in metadata.
+    path_to_metadata = os.path.join(folder,
+                                    feedlog_name.replace('FeedLog', 'MetaData'))
+    metadata_csv = metadata(path_to_metadata, fast_io=fast_io)
+    metadata_csv['ChamberID'] = chamber_ids(metadata_csv.ID,
+                                            datetime_exptname)
+
+    # Read in feedlog.
+    path_to_feedlog = os.path.join(folder, feedlog_name)
+    feedlog_csv = feedlog(path_to_feedlog, fast_io=fast_io)
+    feedlog_csv.loc[:,'ChamberID'] = chamber_ids(feedlog_csv.ChamberID,
+                                                 datetime_exptname)
+
+    # Detect non-feeding flies.
+    non_feeding_flies = detect_non_feeding_flies(metadata_csv, feedlog_csv)
+
+    return metadata_csv, feedlog_csv, non_feeding_flies
+
+
+
 def detect_non_feeding_flies(metadata_df,feedlog_df):
     """
     Detects non-feeding flies.
@@ -250,12 +312,35 @@ def detect_non_feeding_flies(metadata_df,feedlog_df):
     Pass along a munged metadata and corresponding munged feedlog.
     Returns the non-feeding flies as a list.
     """
+    feeding_flies = set(feedlog_df.dropna().ChamberID.unique())
     non_feeding_flies = [chamberid for chamberid in metadata_df.ChamberID.unique()
-                        if chamberid not in feedlog_df.dropna().ChamberID.unique()]
+                        if chamberid not in feeding_flies]
     return non_feeding_flies
 
 
 
+def to_sorted_categorical(values):
+    """
+    Returns `values` (a pandas Series) as an ordered Categorical, with its
+    observed values sorted as the categories. Missing values are not
+    categories.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if hasattr(values, 'cat'):
+        # Already categorical: only the categories need sorting.
+        cats = np.sort(values.cat.remove_unused_categories().cat.categories)
+        return values.cat.set_categories(cats, ordered=True)
+
+    # A single pass that both encodes the values and sorts the uniques.
+    codes, uniques = pd.factorize(values, sort=True)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques,
+                                               ordered=True),
+                     index=values.index, name=values.name)
+
+
+
 def make_categorical_columns(df, added_labels=None):
     """
     Turns Genotype, Status, Temperature, Sex, FlyCountInChamber columns
@@ -264,7 +349,6 @@ def make_categorical_columns(df, added_labels=None):
     If there are added labels, this is also done.
     """
 
-    import numpy as np
     import pandas as pd
 
     # Assign Status based on genotype.
@@ -291,15 +375,14 @@ def make_categorical_columns(df, added_labels=None):
 
     for col in cols:
         try:
-            c = df[col]
-            df.loc[:, col] = pd.Categorical(c, categories=np.sort(c.unique()),
-                                            ordered=True)
+            df.loc[:, col] = to_sorted_categorical(df[col])
         except KeyError:
             pass
 
     # Remove unused categories.
     for c in ['Status', 'Genotype', *cols]:
-        df.loc[:, c].cat.remove_unused_categories(inplace=True)
+        if c in df.columns:
+            df[c] = df[c].cat.remove_unused_categories()
 
 
 
@@ -379,12 +462,8 @@ def sum_for_timecourse(resamp_feeds):
     """
     Convenience function to sum a resampled feedlog for timecourse plotting.
     """
-    from pandas import DataFrame
     # from . import __static as static
 
-    temp = resamp_feeds.copy()
-    temp_sum = DataFrame(temp.to_records())
-
     # gbp_cols = [*static.grpby_cols,
     #             *[a for a in added_labels if a in temp_sum.columns]
     #             ]
@@ -395,9 +474,9 @@ def sum_for_timecourse(resamp_feeds):
                         'AverageFeedSpeedPerFly_µl/s'
                         ]
 
-    temp_sum = temp_sum[cols_of_interest]
-
-    temp_sum.fillna(0, inplace=True)
+    # `resamp_feeds` is already flat (see `groupby_resamp_sum`), so just
+    # select the columns of interest; this also gives us a new frame to fill.
+    temp_sum = resamp_feeds[cols_of_interest].fillna(0)
     # temp_sum = add_time_column(temp_sum)
 
     return temp_sum
@@ -475,6 +554,34 @@ def assign_food_choice(chamberid, choiceid, mapper):
 
 
 
+def assign_food_choices(feeds, mapper):
+    """
+    Vectorized version of `assign_food_choice`, for all the feeds at once.
+
+    `mapper` is indexed by ChamberID, with one `Tube<n>` column per food
+    choice. Returns an array with the food choice of each feed; feeds whose
+    ChamberID or `Tube<ChoiceIdx + 1>` column is not in `mapper` get NaN.
+    """
+    import numpy as np
+
+    rows = mapper.index.get_indexer(feeds.ChamberID)
+
+    # There are only a few distinct choices, so only look their Tube
+    # columns up once.
+    choice_ids, choice_codes = np.unique(feeds.ChoiceIdx.to_numpy() + 1,
+                                         return_inverse=True)
+    choice_cols = mapper.columns.get_indexer(['Tube{}'.format(c)
+                                              for c in choice_ids])
+    cols = choice_cols[choice_codes]
+
+    found = (rows >= 0) & (cols >= 0)
+    food_choices = np.full(len(feeds), np.nan, dtype=object)
+    food_choices[found] = mapper.to_numpy(dtype=object)[rows[found],
+                                                        cols[found]]
+    return food_choices
+
+
+
 def assign_status_from_genotype(genotype):
     """ Convenience function to map genotype to status."""
     if 'w1118' in genotype.lower():
@@ -486,6 +593,32 @@ def assign_status_from_genotype(genotype):
 
 
 
+def join_label_cols(df, cols, sep=','):
+    """
+    Concatenates the columns `cols` of `df` row by row, with `sep` as the
+    delimiter, skipping missing values. Returns an array of strings.
+
+    The rows are grouped by their values in `cols` first, so the strings are
+    only built once for each distinct combination rather than for every row.
+    """
+    import numpy as np
+    import pandas as pd
+
+    keys = df[cols]
+    # Group on the (integer) factorized codes of the columns; missing values
+    # get their own code (-1), so they are kept as groups too.
+    codes = np.column_stack([pd.factorize(keys[c])[0] for c in cols])
+    _, first_rows, group_ids = np.unique(codes, axis=0, return_index=True,
+                                         return_inverse=True)
+    group_ids = group_ids.ravel()
+    # The first row of each group stands in for the whole group.
+    group_labels = keys.iloc[first_rows].apply(
+                                    lambda x: sep.join(x.dropna().astype(str)),
+                                    axis=1)
+    return group_labels.to_numpy(dtype=object)[group_ids]
+
+
+
 def join_cols(df, cols, sep='; '):
     """
     Convenience function to concatenate all the columns found in
@@ -552,50 +685,172 @@ def cat_categorical_columns(df, group_by, compare_by):
 
 
 
-def contrast_plot_munger(feeds, flies, added_labels, group_by, compare_by,
-                         color_by, start_hour, end_hour):
-    """Convenience Function for munging before contrast plotting."""
+def groupby_sum_min(df, group_by_cols, sum_cols, min_col):
+    """
+    Groups `df` by `group_by_cols`, then sums the `sum_cols`, and takes the
+    minimum of `min_col` over the rows that have no missing values.
 
-    from numpy import unique, repeat
-    from numpy import nan as npnan
-    from pandas import Series, DataFrame, concat, merge
-    # from . import __static as static
+    Returns the two aggregated DataFrames, indexed by `group_by_cols`.
+
+    The aggregation is done with pandas. Set the environment variable
+    `ESPRESSO_BACKEND` to 'polars' to do it with polars (if installed)
+    instead.
+    """
+    import os
+
+    if os.environ.get('ESPRESSO_BACKEND', 'pandas').lower() == 'polars':
+        import polars as pl
+
+        work = pl.from_pandas(df[[*group_by_cols, *sum_cols, min_col]])
+        grp_sum = work.group_by(group_by_cols)\
+                      .agg([pl.col(c).sum() for c in sum_cols])\
+                      .to_pandas().set_index(group_by_cols)
+        grp_min = work.drop_nulls()\
+                      .group_by(group_by_cols)\
+                      .agg(pl.col(min_col).min())\
+                      .to_pandas().set_index(group_by_cols)
+        return grp_sum, grp_min
+
+    # The groupby results are already indexed by `group_by_cols`.
+    # Only aggregate the key combinations that actually occur; with
+    # Categorical keys the default would create a row for every combination
+    # of categories. Callers merge or sort the results, so skip sorting.
+    gby_kwargs = dict(observed=True, sort=False)
+    grp_sum = df.groupby(group_by_cols, **gby_kwargs)[sum_cols].sum()
+    grp_min = df.dropna().groupby(group_by_cols, **gby_kwargs)[[min_col]].min()
+
+    return grp_sum, grp_min
+
+
+
+def _duration_and_speed_numpy(volume_ul, duration_ms, duration_min, speed):
+    """
+    Fills in the feed duration in minutes, and the feed speed in nl/s.
+    The speed is NaN wherever the feed duration is zero.
+    """
+    import numpy as np
 
-    # Drop invalid feeds.
-    df = feeds[feeds.Valid].copy()
-    flies_ = flies.copy()
-    flies_indexed = flies_.set_index('ChamberID')
+    duration_min[:] = duration_ms * (1. / 60000)
+    with np.errstate(divide='ignore'):
+        inv_duration = np.where(duration_ms > 0, 1. / duration_ms, np.nan)
+    speed[:] = volume_ul * inv_duration * 1000000
 
+
+
+def _duration_and_speed_loop(volume_ul, duration_ms, duration_min, speed):
+    """
+    Loop version of `_duration_and_speed_numpy`, compiled with numba.
+    """
+    for i in range(duration_ms.shape[0]):
+        duration_min[i] = duration_ms[i] * (1. / 60000)
+        if duration_ms[i] > 0:
+            speed[i] = volume_ul[i] / duration_ms[i] * 1000000
+        else:
+            speed[i] = _nan
+
+
+
+@_lru_cache(maxsize=None)
+def _duration_and_speed_kernel():
+    """
+    Returns `_duration_and_speed_loop` compiled with numba, or the numpy
+    version if numba is not installed. numba is only imported on first use,
+    so that importing espresso stays light.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return _duration_and_speed_numpy
+    # Release the GIL so contrast plots munged from several threads
+    # do not serialize on this kernel.
+    return njit(nogil=True, cache=True)(_duration_and_speed_loop)
+
+
+
+def _duration_and_speed(volume_ul, duration_ms):
+    """
+    Returns the feed duration in minutes, and the feed speed in nl/s.
+    The speed is NaN wherever the feed duration is zero.
+    """
+    import numpy as np
+
+    duration_min = np.empty(duration_ms.shape[0])
+    speed = np.empty(duration_ms.shape[0])
+    _duration_and_speed_kernel()(volume_ul, duration_ms, duration_min, speed)
+    return duration_min, speed
+
+
+
+def check_contrast_columns(feeds, group_by, compare_by, color_by):
+    """
+    Checks that `group_by`, `compare_by` and `color_by` can be used to
+    produce a contrast plot from `feeds`. Raises an error if not.
+    """
     if isinstance(group_by, str):
         if group_by == compare_by:
             raise ValueError("`group_by` and `compare_by` cannot be identical.")
-        gby = ["ChamberID", compare_by, color_by, group_by]
         cat_cols = [compare_by, color_by, group_by]
 
     elif isinstance(group_by, (tuple, list)):
         if compare_by in group_by:
             raise ValueError("`compare_by` cannot be one of the factors" +
                              " in `group_by.`")
-        gby = ["ChamberID", compare_by, color_by, *group_by]
         cat_cols = [compare_by, color_by, *group_by]
 
     for c in cat_cols:
-        check_column(c, df)
+        check_column(c, feeds)
 
-    if len(df[compare_by].unique()) < 2:
+    if len(feeds.loc[feeds.Valid.astype(bool), compare_by].unique()) < 2:
         err = '{} has less than 2 categories'.format(compare_by) + \
               ' and cannot be used for `compare_by`.'
         raise ValueError(err)
 
 
+
+def contrast_plot_munger(feeds, flies, added_labels, group_by, compare_by,
+                         color_by, start_hour, end_hour, validate=True):
+    """
+    Convenience Function for munging before contrast plotting.
+
+    If `validate` is False, the columns are assumed to have already been
+    checked with `check_contrast_columns`.
+    """
+
+    from numpy import repeat
+    from numpy import nan as npnan
+    from pandas import Series, DataFrame, concat, merge
+    # from . import __static as static
+
+    if validate:
+        check_contrast_columns(feeds, group_by, compare_by, color_by)
+
+    flies_indexed = flies.set_index('ChamberID')
+
+    if isinstance(group_by, str):
+        gby = ["ChamberID", compare_by, color_by, group_by]
+    elif isinstance(group_by, (tuple, list)):
+        gby = ["ChamberID", compare_by, color_by, *group_by]
+
+    # `color_by` is often the same column as `compare_by` (or a `group_by`
+    # factor); only group on each column once.
+    gby = list(dict.fromkeys(gby))
+
+    # Drop invalid feeds, keeping only the columns aggregated below.
+    sum_cols = ["FeedDuration_ms", 'AverageFeedVolumePerFly_µl',
+                'AverageFeedCountPerFly', 'AverageFeedSpeedPerFly_µl/s']
+    keep_cols = list(dict.fromkeys([*gby, "FoodChoice", *sum_cols,
+                                    "RelativeTime_s"]))
+    valid = feeds.Valid.to_numpy(dtype=bool)
+    df = DataFrame({c: feeds[c].values[valid] for c in keep_cols})
+
     # Select feeds in time window
     after_start = df.RelativeTime_s > start_hour * 3600
     before_end = df.RelativeTime_s < end_hour * 3600
-    df_in_window = df[after_start & before_end].copy()
+    df_in_window = df[after_start & before_end]
 
     # Add padrows for food choices that did not get fed upon within
     # the time window.
-    inactive_chambers_in_time_window = [c for c in flies_.ChamberID.unique()
+    inactive_chambers_in_time_window = [c for c in flies.ChamberID.unique()
                                         if c not in df_in_window.ChamberID.unique()]
     # spacer_timepont = ((end_hour + start_hour) / 2) * 3600
 
@@ -606,7 +861,6 @@ def contrast_plot_munger(feeds, flies, added_labels, group_by, compare_by,
                             index=df.columns)
             padrow.loc['FoodChoice'] = choice
             padrow.loc['ChamberID'] = chamberid
-            padrow.loc['ExperimentState'] = "PAD"
             for g in [c for c in gby
                       if c in flies_indexed.columns]:
                 padrow.loc[g] = flies_indexed.loc[chamberid, g]
@@ -616,26 +870,12 @@ def contrast_plot_munger(feeds, flies, added_labels, group_by, compare_by,
 
     for c in ['AverageFeedVolumePerFly_µl', 'AverageFeedCountPerFly']:
         padded.loc[:, c] = repeat(0, len(padded))
-    df_in_window_padded = df_in_window.append(padded, ignore_index=True, sort=False)
-
-    # Groupby and sum.
-    grouped_sum = df_in_window_padded.groupby(gby).sum()
-    # Groupby and min for latency to first feed.
-    grouped_min = df_in_window_padded.dropna().groupby(gby).min()
-    for g in [grouped_sum, grouped_min]:
-        g.reset_index(inplace=True)
-        g.sort_values(gby, inplace=True)
-
+    df_in_window_padded = concat([df_in_window, padded],
+                                 ignore_index=True, sort=False)
 
-    grp_sum = grouped_sum[[*gby, "FeedDuration_ms",
-                           'AverageFeedVolumePerFly_µl',
-                           'AverageFeedCountPerFly',
-                           'AverageFeedSpeedPerFly_µl/s']].copy()
-
-    grp_min = grouped_min[[*gby, "RelativeTime_s"]].copy()
-
-    grp_sum.set_index(gby, inplace=True)
-    grp_min.set_index(gby, inplace=True)
+    # Groupby and sum, and groupby and min for latency to first feed.
+    grp_sum, grp_min = groupby_sum_min(df_in_window_padded, gby,
+                                       sum_cols, "RelativeTime_s")
 
     plotdf = merge(left=grp_sum, right=grp_min, how='outer',
                    left_index=True, right_index=True).reset_index()
@@ -670,7 +910,8 @@ def contrast_plot_munger(feeds, flies, added_labels, group_by, compare_by,
 
         if len(missing_rows) > 0:
             missing = concat(missing_rows)
-            plotdf = plotdf.reset_index().append(missing, ignore_index=True, sort=False)
+            plotdf = concat([plotdf.reset_index(), missing],
+                            ignore_index=True, sort=False)
             plotdf.sort_values(gby, inplace=True)
 
         else:
@@ -727,14 +968,23 @@ def contrast_plot_munger(feeds, flies, added_labels, group_by, compare_by,
     # plot_df.drop(["Valid"], axis=1, inplace=True)
 
     # Rename columns for easy plotting.
-    plotdf['RelativeTime_min'] = plotdf['RelativeTime_s'] / 60
-    plotdf['RelativeTime_hour'] = plotdf['RelativeTime_min'] / 60
-
-    plotdf['FeedDuration_min'] = plotdf['FeedDuration_ms'] / 60000
-
-    av = plotdf['AverageFeedVolumePerFly_µl']
-    t = plotdf['FeedDuration_ms']
-    plotdf['Feed Speed\nPer Fly (nl/s)'] = (av / t) * 1000000
+    # Work on the underlying arrays; this avoids aligning indexes for
+    # every intermediate Series.
+    # These run on the aggregated rows (one per chamber and food choice),
+    # so converting units here is cheaper than adding converted columns to
+    # the whole feedlog.
+    latency_s = plotdf['RelativeTime_s'].to_numpy(dtype='float64')
+    plotdf['RelativeTime_sec'] = latency_s
+    plotdf['RelativeTime_min'] = latency_s * (1. / 60)
+    plotdf['RelativeTime_hour'] = latency_s * (1. / 3600)
+
+    # Feed speed is undefined (NaN) for chambers that did not feed.
+    av = plotdf['AverageFeedVolumePerFly_µl'].to_numpy(dtype='float64')
+    duration_ms = plotdf['FeedDuration_ms'].to_numpy(dtype='float64')
+    duration_min, speed = _duration_and_speed(av, duration_ms)
+    plotdf['FeedDuration_s'] = duration_ms * (1. / 1000)
+    plotdf['FeedDuration_min'] = duration_min
+    plotdf['Feed Speed\nPer Fly (nl/s)'] = speed
 
     rename_cols = {
         'AverageFeedCountPerFly'     :  'Total\nFeed Count\nPer Fly',
@@ -7,6 +7,13 @@
 contrast plot functions for espresso objects.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+from . import plot_helpers as plothelp
+from .._munger import munger as munge
+
+
+
 class contrast_plotter:
     """
     contrast plotting class for espresso object.
@@ -20,18 +27,164 @@ class contrast_plotter:
 
     feed_duration_per_fly
     latency_to_feed
+
+    all_metrics
     """
 
+    # The munged column for each metric. Volumes are formatted with their
+    # prefix, and times with their unit.
+    _CONTRAST_COLUMNS = {'count'   : 'Total\nFeed Count\nPer Fly',
+                         'volume'  : 'Total\nFeed Volume\nPer Fly ({}l)',
+                         'speed'   : 'Feed Speed\nPer Fly ({}l/s)',
+                         'duration': 'Total Time\nFeeding\nPer Fly ({})',
+                         'latency' : 'Latency to\nFirst Feed ({})'}
+
+    # The volume prefix each volume metric is munged in, and its symbol.
+    _MUNGED_VOLUME_PREFIXES = {'volume': ('micro', 'µ'),
+                               'speed' : ('nano', 'n')}
+
+    # Accepted time units, and their abbreviations in the plot columns.
+    _CONTRAST_TIME_UNITS = {'duration': {'second': 'sec', 'minute': 'min'},
+                            'latency' : {'second': 'sec', 'minute': 'min',
+                                         'hour'  : 'hr'}}
+
 
 
     def __init__(self, plotter):
-        self.__feeds = plotter._experiment.feeds.copy()
-        self.__flies = plotter._experiment.flies
+        # Keep a reference to the espresso object rather than to its
+        # DataFrames, so that labels attached later are picked up.
+        self.__experiment = plotter._experiment
         self.__expt_end_hour = plotter._experiment.expt_duration_minutes / 60
+        # Munged plot data, keyed by the arguments used to munge it. All the
+        # contrast plots share the same munging, so this is done only once
+        # for each combination.
+        self.__plot_data = dict()
+        # Column combinations that have already passed validation.
+        self.__validated = set()
+        # Both of the above are only valid for this version of the feeds.
+        self.__cache_version = self.__feeds_version
+
+
+
+    @property
+    def __feeds(self):
+        return self.__experiment.feeds
+
+
+
+    @property
+    def __flies(self):
+        return self.__experiment.flies
+
+
+
+    @property
+    def __added_labels(self):
         try:
-            self.__added_labels = plotter._experiment.added_labels
+            return self.__experiment.added_labels
         except AttributeError:
-            self.__added_labels = [None]
+            return [None]
+
+
+
+    @property
+    def __feeds_version(self):
+        # Bumped by the espresso object whenever its feeds are modified.
+        # Objects pickled before this was added have no version.
+        return getattr(self.__experiment, '_feeds_version', 0)
+
+
+
+    def __prep_plot_df(self, group_by, compare_by, color_by,
+                       start_hour, end_hour):
+        """
+        Returns a copy of the munged feeds for contrast plotting and their
+        dabest idx, munging them only if these keywords have not been seen
+        before.
+        """
+        if isinstance(group_by, str):
+            group_by_key = group_by
+        else:
+            group_by_key = tuple(group_by)
+        key = (group_by_key, compare_by, color_by, start_hour, end_hour)
+
+        if self.__cache_version != self.__feeds_version:
+            self.__plot_data.clear()
+            self.__validated.clear()
+            self.__cache_version = self.__feeds_version
+
+        if key not in self.__plot_data:
+            # The columns only need checking once, whatever the time window.
+            validation_key = (group_by_key, compare_by, color_by)
+            if validation_key not in self.__validated:
+                munge.check_contrast_columns(self.__feeds, group_by,
+                                             compare_by, color_by)
+                self.__validated.add(validation_key)
+
+            self.__plot_data[key] = plothelp.prep_feeds_for_contrast_plot(
+                                                        self.__feeds,
+                                                        self.__flies,
+                                                        self.__added_labels,
+                                                        group_by, compare_by,
+                                                        color_by,
+                                                        start_hour, end_hour,
+                                                        validate=False)
+
+        # The plots add their own columns, so hand out a copy.
+        plot_df, idx = self.__plot_data[key]
+        return plot_df.copy(), idx
+
+
+
+    def __contrast_plotter(self, metric, group_by, compare_by, color_by,
+                           start_hour, end_hour, volume_unit=None,
+                           time_unit=None):
+        """
+        Returns the dabest object for `metric`, which is one of the keys of
+        `_CONTRAST_COLUMNS`. All the metrics share the same munged feeds.
+        """
+        start, end = plothelp.check_time_window(start_hour, end_hour,
+                                                self.__expt_end_hour)
+
+        return self.__load_metric(metric, group_by, compare_by, color_by,
+                                  start, end, volume_unit=volume_unit,
+                                  time_unit=time_unit)
+
+
+
+    def __load_metric(self, metric, group_by, compare_by, color_by,
+                      start, end, volume_unit=None, time_unit=None):
+        """
+        As `__contrast_plotter`, for a time window that has already been
+        checked.
+        """
+        yvar = self._CONTRAST_COLUMNS[metric]
+
+        if metric in self._CONTRAST_TIME_UNITS:
+            time_dict = self._CONTRAST_TIME_UNITS[metric]
+            if time_unit not in time_dict.keys():
+                raise ValueError("{} is not an accepted unit of time {}"\
+                                .format(time_unit, [a for a in time_dict.keys()])
+                                )
+            yvar = yvar.format(time_dict[time_unit])
+
+        plot_df, idx = self.__prep_plot_df(group_by, compare_by, color_by,
+                                           start, end)
+
+        if metric in self._MUNGED_VOLUME_PREFIXES:
+            convert_from, symbol = self._MUNGED_VOLUME_PREFIXES[metric]
+            plot_col = yvar.format(symbol)
+
+            if volume_unit.strip().split('lit')[0] == convert_from:
+                yvar = plot_col
+            else:
+                multiplier = plothelp.get_unit_multiplier(volume_unit,
+                                                    convert_from=convert_from)
+                new_unit = plothelp.get_new_prefix(volume_unit)
+                yvar = yvar.format(new_unit)
+                plot_df[yvar] = plot_df[plot_col] * multiplier
+
+        return plothelp.dabest_parser(plot_df, yvar, idx=idx)
 
 
 
@@ -76,34 +229,11 @@ class contrast_plotter:
         A dabest object for further plotting and analyses.
         """
 
-        from . import plot_helpers as plothelp
-
-        start, end = plothelp.check_time_window(start_hour, end_hour,
-                                                self.__expt_end_hour)
-
-        plot_df = plothelp.prep_feeds_for_contrast_plot(self.__feeds,
-                                                        self.__flies,
-                                                        self.__added_labels,
-                                                        group_by, compare_by,
-                                                        color_by, start, end)
-                                                        
-        
-
-        yvar = 'Total\nFeed Count\nPer Fly'
-        
-        return plothelp.dabest_parser(plot_df, yvar)
-        
-        # if 'float_contrast' not in kwargs.keys():
-        #     kwargs['float_contrast'] = False
-        # fig, stats =  plothelp.dabest_parser(plot_df, yvar, color_by, **kwargs)
-        # 
-        # title = '{} hr to {} hr'.format(start, end)
-        # fig.suptitle(title, fontsize=36)
-        # 
-        # if return_plot_data:
-        #     return fig, stats, plot_df
-        # else:
-        #     return fig, stats
+        return self.__contrast_plotter('count', group_by=group_by,
+                                       compare_by=compare_by,
+                                       color_by=color_by,
+                                       start_hour=start_hour,
+                                       end_hour=end_hour)
 
 
 
@@ -145,40 +275,13 @@ class contrast_plotter:
         A dabest object for further plotting and analyses.
         """
 
-        from . import plot_helpers as plothelp
+        return self.__contrast_plotter('volume', group_by=group_by,
+                                       compare_by=compare_by,
+                                       color_by=color_by,
+                                       start_hour=start_hour,
+                                       end_hour=end_hour,
+                                       volume_unit=volume_unit)
 
-        start, end = plothelp.check_time_window(start_hour, end_hour,
-                                             self.__expt_end_hour)
-
-        plot_df = plothelp.prep_feeds_for_contrast_plot(self.__feeds,
-                                                        self.__flies,
-                                                        self.__added_labels,
-                                                        group_by, compare_by,
-                                                        color_by, start, end)
-
-        plot_col = 'Total\nFeed Volume\nPer Fly (µl)'
-
-        if volume_unit.strip().split('lit')[0] == 'micro':
-            yvar = plot_col
-        else:
-            multiplier = plothelp.get_unit_multiplier(volume_unit,
-                                                      convert_from='micro')
-            new_unit = plothelp.get_new_prefix(volume_unit)
-            yvar = 'Total\nFeed Volume\nPer Fly ({}l)'.format(new_unit)
-            plot_df[yvar] = plot_df[plot_col] * multiplier
-            
-        return plothelp.dabest_parser(plot_df, yvar)
-
-        # kwargs['float_contrast'] = False # Fix this as False!
-        # fig, stats =  plothelp.dabest_parser(plot_df, yvar, color_by, **kwargs)
-        # 
-        # title = '{} hr to {} hr'.format(start, end)
-        # fig.suptitle(title, fontsize=36)
-        # 
-        # if return_plot_data:
-        #     return fig, stats, plot_df
-        # else:
-        #     return fig, stats
 
 
     def feed_speed_per_fly(self, group_by, compare_by, color_by='Genotype',
@@ -219,41 +322,12 @@ class contrast_plotter:
         A dabest object for further plotting and analyses.
         """
 
-        from . import plot_helpers as plothelp
-
-        start, end = plothelp.check_time_window(start_hour, end_hour,
-                                             self.__expt_end_hour)
-
-        plot_df = plothelp.prep_feeds_for_contrast_plot(self.__feeds,
-                                                        self.__flies,
-                                                        self.__added_labels,
-                                                        group_by, compare_by,
-                                                        color_by, start, end)
-
-        plot_col = 'Feed Speed\nPer Fly (nl/s)'
-
-        if volume_unit.strip().split('lit')[0] == 'nano':
-            yvar = plot_col
-        else:
-            multiplier = plothelp.get_unit_multiplier(volume_unit,
-                                                      convert_from='nano')
-            new_unit = plothelp.get_new_prefix(volume_unit)
-            yvar = 'Feed Speed\nPer Fly ({}l/s)'.format(new_unit)
-            plot_df[yvar] = plot_df[plot_col] * multiplier
-            
-        return plothelp.dabest_parser(plot_df, yvar)
-
-        # if 'float_contrast' not in kwargs.keys():
-        #     kwargs['float_contrast'] = False
-        # fig, stats =  plothelp.dabest_parser(plot_df, yvar, color_by, **kwargs)
-        # 
-        # title = '{} hr to {} hr'.format(start, end)
-        # fig.suptitle(title, fontsize=36)
-        # 
-        # if return_plot_data:
-        #     return fig, stats, plot_df
-        # else:
-        #     return fig, stats
+        return self.__contrast_plotter('speed', group_by=group_by,
+                                       compare_by=compare_by,
+                                       color_by=color_by,
+                                       start_hour=start_hour,
+                                       end_hour=end_hour,
+                                       volume_unit=volume_unit)
 
 
 
@@ -294,36 +368,12 @@ class contrast_plotter:
         A dabest object for further plotting and analyses.
         """
 
-        from . import plot_helpers as plothelp
-
-        start, end = plothelp.check_time_window(start_hour, end_hour,
-                                             self.__expt_end_hour)
-        plot_df = plothelp.prep_feeds_for_contrast_plot(self.__feeds,
-                                                        self.__flies,
-                                                        self.__added_labels,
-                                                        group_by, compare_by,
-                                                        color_by, start, end)
-
-        time_dict = {'second': 'sec', 'minute': 'min'}
-        if time_unit not in time_dict.keys():
-            raise ValueError("{} is not an accepted unit of time {}"\
-                            .format(time_unit, [a for a in time_dict.keys()])
-                            )
-        yvar = 'Total Time\nFeeding\nPer Fly ({})'.format(time_dict[time_unit])
-        
-        return plothelp.dabest_parser(plot_df, yvar)
-        
-        # if 'float_contrast' not in kwargs.keys():
-        #     kwargs['float_contrast'] = False
-        # fig, stats =  plothelp.dabest_parser(plot_df, yvar, color_by, **kwargs)
-        # 
-        # title = '{} hr to {} hr'.format(start, end)
-        # fig.suptitle(title, fontsize=36)
-        # 
-        # if return_plot_data:
-        #     return fig, stats, plot_df
-        # else:
-        #     return fig, stats
+        return self.__contrast_plotter('duration', group_by=group_by,
+                                       compare_by=compare_by,
+                                       color_by=color_by,
+                                       start_hour=start_hour,
+                                       end_hour=end_hour,
+                                       time_unit=time_unit)
 
 
 
@@ -362,38 +412,72 @@ class contrast_plotter:
         -------
         A dabest object for further plotting and analyses.
         """
-        from . import plot_helpers as plothelp
-        from .._munger import munger as munge
 
-        end_hr = self.__expt_end_hour
-        plot_df = plothelp.prep_feeds_for_contrast_plot(self.__feeds,
-                                                        self.__flies,
-                                                        self.__added_labels,
-                                                        group_by, compare_by,
-                                                        color_by, start_hour=0,
-                                                        end_hour=end_hr
-                                                        )
-
-        time_dict = {'second':  'sec',
-                     'minute':  'min',
-                     'hour'  :  'hr'}
-        if time_unit not in time_dict.keys():
-            raise ValueError("{} is not an accepted unit of time {}"\
-                            .format(time_unit, [a for a in time_dict.keys()])
-                            )
-        yvar = 'Latency to\nFirst Feed ({})'.format(time_dict[time_unit])
-        
-        return plothelp.dabest_parser(plot_df, yvar)
-        
-        
-        # if 'float_contrast' not in kwargs.keys():
-        #     kwargs['float_contrast'] = False
-        # fig, stats =  plothelp.dabest_parser(plot_df, yvar, color_by, **kwargs)
-        # 
-        # title = '{} hr to {} hr'.format(0, end_hr)
-        # fig.suptitle(title, fontsize=36)
-        # 
-        # if return_plot_data:
-        #     return fig, stats, plot_df
-        # else:
-        #     return fig, stats
+        return self.__contrast_plotter('latency', group_by=group_by,
+                                       compare_by=compare_by,
+                                       color_by=color_by,
+                                       start_hour=0, end_hour=None,
+                                       time_unit=time_unit)
+
+
+
+    def all_metrics(self, group_by, compare_by, color_by='Genotype',
+                    start_hour=0, end_hour=None, volume_unit='nanoliter',
+                    time_unit='minute', max_workers=4):
+
+        """
+        Produces the dabest objects for the feed count, feed volume, feed
+        speed, and feed duration per fly in one go. The feeds are munged
+        once, and the four dabest objects are then loaded concurrently if
+        the matplotlib backend is 'agg'. With any other (eg. interactive)
+        backend, they are loaded one after the other.
+
+        Keywords
+        --------
+        group_by, compare_by, color_by, start_hour, end_hour:
+            As for `feed_count_per_fly`.
+
+        volume_unit: string, default 'nanoliter'
+            The unit of volume for the feed volume and feed speed.
+            See `feed_volume_per_fly`.
+
+        time_unit: string, default 'minute'
+            The unit of time for the feed duration. Accepts 'second', or
+            'minute'.
+
+        max_workers: int, default 4
+            The number of threads used to load the dabest objects with the
+            'agg' backend. If 1, they are always loaded one after the other.
+
+        Returns
+        -------
+        A dict of dabest objects, with the keys 'count', 'volume', 'speed',
+        and 'duration'.
+        """
+        import matplotlib as mpl
+
+        kwargs = {'count'   : {},
+                  'volume'  : {'volume_unit': volume_unit},
+                  'speed'   : {'volume_unit': volume_unit},
+                  'duration': {'time_unit': time_unit}}
+
+        # Munge (and validate) up front, so that the threads only ever read
+        # the cached plot data.
+        start, end = plothelp.check_time_window(start_hour, end_hour,
+                                                self.__expt_end_hour)
+        self.__prep_plot_df(group_by, compare_by, color_by, start, end)
+
+        def load(metric):
+            return self.__load_metric(metric, group_by, compare_by, color_by,
+                                      start, end, **kwargs[metric])
+
+        # Only use threads with the non-interactive 'agg' backend; GUI
+        # backends are not thread-safe.
+        if max_workers == 1 or mpl.get_backend().lower() != 'agg':
+            return {metric: load(metric) for metric in kwargs.keys()}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {metric: executor.submit(load, metric)
+                       for metric in kwargs.keys()}
+
+        return {metric: f.result() for metric, f in futures.items()}
@@ -7,6 +7,8 @@
 cumulative plotting functions for espresso objects.
 """
 
+from .plot_helpers import poster_style as _poster_style
+
 
 
 class cumulative_plotter:
@@ -16,8 +18,9 @@ class cumulative_plotter:
 
 
     def __init__(self, plotter): # pass along an espresso_plotter instance.
-        self.__feeds = plotter._experiment.feeds.copy()
-        self.__flies = plotter._experiment.flies
+        # The feeds are only ever read here, so refer to them through the
+        # espresso object instead of copying them.
+        self.__experiment = plotter._experiment
         self.__expt_end_time = plotter._experiment.expt_duration_minutes
         # try:
         #     self.__added_labels = plotter._experiment.added_labels
@@ -25,6 +28,19 @@ class cumulative_plotter:
         #     self.__added_labels = [None]
 
 
+
+    @property
+    def __feeds(self):
+        return self.__experiment.feeds
+
+
+
+    @property
+    def __flies(self):
+        return self.__experiment.flies
+
+
+    @_poster_style
     def __cumulative_plotter(self, yvar, row, col, time_col,
                              start_hour, end_hour,  ylim, color_by,
                              volume_unit=None, font_scale=1.5,
@@ -107,7 +123,6 @@ class cumulative_plotter:
 
         # initialise FacetGrid.
         sys.stdout.write('\nPlotting')
-        sns.set(style='ticks', context='poster')
 
         g = sns.FacetGrid(plotdf, row=row, col=col,
                           hue=color_by, legend_out=True,
@@ -149,7 +164,6 @@ class cumulative_plotter:
         sys.stdout.write('.')
 
         sns.despine(fig=g.fig, offset={'left':5, 'bottom': 5})
-        sns.set() # reset style.
         sys.stdout.write('.')
 
         # End and return the FacetGrid.
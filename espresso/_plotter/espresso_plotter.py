@@ -10,6 +10,16 @@ Plot functions for espresso objects.
 # import sys as _sys
 # _sys.path.append("..") # so we can import munger from the directory above.
 
+import logging as _logging
+
+from . import contrast
+from . import cumulative
+from . import plot_helpers as plothelp
+from .plot_helpers import poster_style as _poster_style
+from .._munger import munger as munge
+
+_logger = _logging.getLogger(__name__)
+
 
 class espresso_plotter():
     """
@@ -39,14 +49,14 @@ class espresso_plotter():
 
     def __init__(self, espresso): # pass along an espresso instance.
 
-        # Add submodules below. The respective .py scripts
-        # should be in the same folder as espresso_plotter.py.
-        from . import contrast as contrast
-        from . import cumulative as cumulative
-
         # Create attribute so the other methods below can access the espresso object.
         self._experiment = espresso
 
+        # Values derived from the feeds (eg. sorted categories), reused
+        # across plots until the feeds change.
+        self.__feeds_cache = {}
+        self.__feeds_cache_version = None
+
         # call obj.plot.xxx to access these methods.
         self.contrast = contrast.contrast_plotter(self)
         self.cumulative = cumulative.cumulative_plotter(self)
@@ -58,84 +68,160 @@ class espresso_plotter():
 
 
 
-    def __plot_rasters(self, current_facet_feeds, current_facet_flies,
-                       maxflycount, color_by, palette,
-                       plot_ax, add_chamberid_labels):
+    def __cached(self):
         """
-        Helper function that actually plots the rasters.
+        Returns the cache of values derived from the feeds and flies. This is
+        emptied whenever they are changed (eg. by `attach_label`).
         """
-        from . import plot_helpers as plothelp
+        feeds = self._experiment.feeds
+        version = (getattr(self._experiment, '_feeds_version', 0),
+                   id(feeds), id(self._experiment.flies))
+        if self.__feeds_cache_version != version:
+            self.__feeds_cache.clear()
+            self.__feeds_cache_version = version
+        return self.__feeds_cache
+
+
+
+    def __sorted_categories(self, column):
+        """
+        Returns the sorted categories observed in `column` of the feeds.
+        """
+        import numpy as np
         import pandas as pd
 
-        # Identify legitimate feeds; sort by time of first feed.
-        _feeding_flies = current_facet_feeds.sort_values(['RelativeTime_s','FeedDuration_s'])\
-                                            .ChamberID.drop_duplicates()\
-                                            .tolist()
-        # Index the current faceted feeds by ChamberID.
-        _current_facet_fly_index = current_facet_feeds.reset_index().set_index('ChamberID')
+        cache = self.__cached()
+        key = ('categories', column)
+        if key not in cache:
+            column_values = self._experiment.feeds[column]
+            if hasattr(column_values, 'cat'):
+                observed = column_values.cat.remove_unused_categories()
+                cats = np.sort(observed.cat.categories)
+            else:
+                cats = pd.Categorical(column_values).categories
+            cache[key] = cats
 
-        # Next, identify which flies did not feed (aka not in list above.)
-        _non_feeding_flies = current_facet_flies[current_facet_flies.AtLeastOneFeed == False].ChamberID.tolist()
-        _flies_in_order = _feeding_flies + _non_feeding_flies
+        return cache[key]
 
-        for k, fly in enumerate(_flies_in_order):
-            rasterplot_kwargs = dict(alpha = 0.75, linewidth = 0,
-                                     ymin = (1/maxflycount) * (maxflycount-k-1),
-                                     ymax = (1/maxflycount) * (maxflycount-k))
 
 
-            if color_by is None:
-                rasterplot_kwargs['facecolor'] = 'grey'
-                rasterplot_kwargs['edgecolor'] = 'grey'
+    def __feed_masks(self):
+        """
+        Returns two boolean arrays over the feeds: the valid feeds, and the
+        feeds with a duration (ie. those that can be drawn as rasters).
+        """
+        cache = self.__cached()
+        if 'masks' not in cache:
+            feeds = self._experiment.feeds
+            cache['masks'] = (feeds.Valid.to_numpy(dtype=bool),
+                              feeds.FeedDuration_s.notna().to_numpy())
+        return cache['masks']
 
 
-            try:
-                _current_facet_fly = _current_facet_fly_index.loc[fly]
-                if isinstance(_current_facet_fly, pd.Series):
-                    rasterplot_kwargs['xmin'] = _current_facet_fly.RelativeTime_s
-                    rasterplot_kwargs['xmax'] = _current_facet_fly.RelativeTime_s + \
-                                                _current_facet_fly.FeedDuration_s
-                    if color_by is not None:
-                        color = palette[_current_facet_fly[color_by]]
-                        rasterplot_kwargs['facecolor'] = color
-                        rasterplot_kwargs['edgecolor'] = color
-                    plot_ax.axvspan(**rasterplot_kwargs)
-
-
-                elif isinstance(_current_facet_fly, pd.DataFrame):
-                    start = _current_facet_fly.RelativeTime_s.tolist()
-                    duration = _current_facet_fly.FeedDuration_s.tolist()
-
-                    for j, feed_start in enumerate(start):
-                        rasterplot_kwargs['xmin'] = feed_start
-                        rasterplot_kwargs['xmax'] = feed_start + duration[j]
-                        if color_by is not None:
-                            current_color_cat = _current_facet_fly[color_by].iloc[j]
-                            color = palette[current_color_cat]
-                            rasterplot_kwargs['facecolor'] = color
-                            rasterplot_kwargs['edgecolor'] = color
-                        plot_ax.axvspan(**rasterplot_kwargs)
 
-            except KeyError:
-                pass
+    def __plot_rasters(self, current_facet_feeds, current_facet_flies,
+                       maxflycount, color_by, color_lut,
+                       plot_ax, add_chamberid_labels):
+        """
+        Helper function that actually plots the rasters.
+        """
+        import numpy as np
+        import pandas as pd
+        from matplotlib.collections import PolyCollection
 
-            if add_chamberid_labels:
-                if fly in _non_feeding_flies:
-                    label_color = 'grey'
-                else:
-                    label_color = 'black'
-                label = fly.split('_')[-1]
-                ypos = (1/maxflycount)*(maxflycount-k-1) + (1/maxflycount)*.5
-                plot_ax.text(-85, ypos, label, color=label_color,
-                             verticalalignment='center',
-                             horizontalalignment='right',
-                             fontsize=8)
+        # The ChamberID labels (if any) are the only y ticks.
+        plot_ax.set_yticks([])
 
+        # Nothing to draw or label in an empty panel.
+        if maxflycount == 0 or \
+           (len(current_facet_feeds) == 0 and len(current_facet_flies) == 0):
+            return
 
+        # Pull out the columns needed as arrays once, and work on those
+        # rather than on the DataFrame.
+        _feed_starts = current_facet_feeds.RelativeTime_s.to_numpy()
+        _feed_durations = current_facet_feeds.FeedDuration_s.to_numpy()
+        _feed_flies = current_facet_feeds.ChamberID.to_numpy()
+
+        # Identify legitimate feeds; sort by time of first feed.
+        # `pd.unique` keeps the order in which each fly first appears.
+        _feed_order = np.lexsort((_feed_durations, _feed_starts))
+        _feeding_flies = pd.unique(_feed_flies[_feed_order])
+
+        # Feeds without a duration cannot be drawn; drop them all at once
+        # here, rather than testing each feed below.
+        _drawable = current_facet_feeds.HasDuration.to_numpy()
+        _feed_starts = _feed_starts[_drawable]
+        _feed_ends = _feed_starts + _feed_durations[_drawable]
+        _feed_flies = _feed_flies[_drawable]
+        if color_by is not None:
+            # `color_lut` is an array of colours indexed by the category codes
+            # of `color_by`; feeds without a value (code -1) take the last
+            # colour, which is grey.
+            _color_codes = current_facet_feeds[color_by].cat.codes.to_numpy()
+            _feed_colors = color_lut[_color_codes[_drawable]]
 
+        # Next, identify which flies did not feed (aka not in list above.)
+        _non_feeding = ~current_facet_flies.AtLeastOneFeed.to_numpy(dtype=bool)
+        _non_feeding_flies = current_facet_flies.ChamberID.to_numpy()[_non_feeding]
+        _flies_in_order = np.concatenate([_feeding_flies, _non_feeding_flies])
+
+        # Work out the raster row of every feed, then build all the
+        # rectangles at once and draw them as a single collection. `axvspan`
+        # makes one artist per feed, which is very slow for panels with many
+        # feeds. The feeding flies take up the first rows, in order, so the
+        # row of each feed is the code of its fly among them.
+        _feed_rows = pd.Categorical(_feed_flies,
+                                    categories=_feeding_flies).codes
+        _feed_rows = _feed_rows.astype(np.int64)
+
+        if add_chamberid_labels:
+            # Label the rows with y tick labels, centred on each row. This
+            # reuses the axis' tick machinery instead of creating a separate
+            # Text artist for every fly.
+            row_height = 1 / maxflycount
+            label_ypos = row_height * (maxflycount -
+                                       np.arange(len(_flies_in_order)) - 1) + \
+                         row_height * .5
+            labels = [fly.split('_')[-1] for fly in _flies_in_order]
+            plot_ax.set_yticks(label_ypos)
+            plot_ax.set_yticklabels(labels, fontsize=8,
+                                    verticalalignment='center',
+                                    horizontalalignment='right')
+
+            _non_feeding_set = set(_non_feeding_flies)
+            for tick_label, fly in zip(plot_ax.get_yticklabels(),
+                                       _flies_in_order):
+                if fly in _non_feeding_set:
+                    tick_label.set_color('grey')
+                else:
+                    tick_label.set_color('black')
+
+        if len(_feed_starts) > 0:
+            raster_verts = plothelp.raster_verts(_feed_starts, _feed_ends,
+                                                 _feed_rows, maxflycount)
+            if color_by is None:
+                raster_colors = 'grey'
+            else:
+                raster_colors = _feed_colors
+            # As with `axvspan`, x is in data coordinates and y is in axes
+            # coordinates. The x-axis limits are set by the caller.
+            # A single PolyCollection for the whole panel is used rather than
+            # a BrokenBarHCollection per fly, which is deprecated in
+            # matplotlib 3.7 and removed in 3.9.
+            rasters = PolyCollection(raster_verts,
+                                     facecolors=raster_colors,
+                                     edgecolors=raster_colors,
+                                     linewidths=0, alpha=0.75,
+                                     transform=plot_ax.get_xaxis_transform())
+            plot_ax.add_collection(rasters, autolim=False)
+
+
+
+    @_poster_style
     def rasters(self, start_hour, end_hour, color_by=None, col=None, row=None,
                 height=10, width=10, add_chamberid_labels=True, palette=None,
-                ax=None, gridlines=True):
+                ax=None, gridlines=True, fig_size=None, verbose=False):
         """
         Produces a raster plot of feed events.
 
@@ -160,7 +246,8 @@ class espresso_plotter():
             The height and width of each panel in inches.
 
         fig_size: tuple (width, height), default None
-            The size of the final figure, in inches.
+            The size of the final figure, in inches. If None, the figure size
+            is computed from `height` and `width`.
 
         palette: matplotlib palette OR a list of named matplotlib colors.
             Full list of matplotlib palettes
@@ -175,25 +262,37 @@ class espresso_plotter():
             Whether or not vertical gridlines are displayed at each major
             (hourly) tick.
 
+        verbose: boolean, default False
+            If True, print the name of each panel as it is plotted. Otherwise
+            these messages are only sent to the module's logger.
+
         Returns
         -------
         matplotlib AxesSubplot(s)
         """
-        import numpy as np
         import matplotlib.pyplot as plt
         import matplotlib.patches as mpatches # for custom legends.
+        from matplotlib.colors import to_rgba_array
         import pandas as pd
         import seaborn as sns
 
-        from . import plot_helpers as plothelp
-        from .._munger import munger as munge
 
-        # make a copy of the metadata and the feedlog.
-        allfeeds = self._experiment.feeds.copy()
-        allflies = self._experiment.flies.copy()
+        feeds = self._experiment.feeds
+        flies = self._experiment.flies
 
         # Check that col, row and color_by keywords are Attributes of the feeds.
-        munge.check_group_by_color_by(col, row, color_by, allfeeds)
+        munge.check_group_by_color_by(col, row, color_by, feeds)
+
+        # Only take the columns the rasters need, rather than copying the
+        # whole metadata and feedlog.
+        attributes = list(dict.fromkeys(a for a in [col, row, color_by]
+                                        if a is not None))
+        allfeeds = feeds.loc[:, ['ChamberID', 'RelativeTime_s',
+                                 'FeedDuration_s', *attributes]]
+        valid_feeds, allfeeds['HasDuration'] = self.__feed_masks()
+        allflies = flies.loc[:, ['ChamberID', 'AtLeastOneFeed',
+                                 *[a for a in attributes
+                                   if a in flies.columns]]]
 
         if row is None and col is None:
             err1 = "Either `row` or `col` must be specified. "
@@ -216,44 +315,71 @@ class espresso_plotter():
         cat_cols = [col, row, color_by]
         for column in [c for c in cat_cols if c is not None]:
             try:
-                cats = np.sort(allfeeds[column].unique())
-                allfeeds.loc[:, column] = pd.Categorical(allfeeds[column],
-                                                       categories=cats,
-                                                       ordered=True)
+                column_values = allfeeds[column]
             except KeyError:
-                pass
+                continue
+            cats = self.__sorted_categories(column)
+            if hasattr(column_values, 'cat'):
+                # Already categorical: remap the integer codes onto the
+                # sorted categories, instead of re-encoding every value.
+                allfeeds[column] = column_values.cat.set_categories(cats,
+                                                                ordered=True)
+            else:
+                allfeeds[column] = pd.Categorical(column_values,
+                                                  categories=cats,
+                                                  ordered=True)
 
-        # Reindex the feeds DataFrame for plotting.
+        # Report on each panel as it is plotted.
+        report = print if verbose else _logger.debug
+
+        # Partition the valid feeds and the flies by facet once, instead of
+        # scanning the whole DataFrames again for every panel.
         facets = [a for a in [col, row] if a is not None]
-        faceted_feeds = allfeeds.set_index(facets)
-        # Reindex the flies DataFrame for plotting.
         facets_metadata = [a for a in facets if a in allflies.columns]
-        faceted_flies = allflies.set_index(facets_metadata)
+
+        def partition(df, by):
+            # Group on a single column directly, so the keys are scalars.
+            grouped = df.groupby(by if len(by) > 1 else by[0],
+                                 sort=False, observed=True)
+            return {key: group for key, group in grouped}
+
+        feeds_by_facet = partition(allfeeds[valid_feeds], facets)
+        no_feeds = allfeeds.iloc[:0]
 
         # Get the number of flies for each group, then identify which is
         # the most numerous group. This is then used to scale the individual
         # facets.
-        allflies_grpby = allflies.groupby(facets_metadata)
-        maxflycount = allflies_grpby.count().ChamberID.max()
-
-        # Get the total flycount.
-        try:
-            in_allflies = [a for a in facets if a in allflies.columns]
-            allflies_grpby = allflies.groupby(in_allflies)
-            maxflycount = allflies_grpby.count().ChamberID.max()
-        except KeyError:
-            # group_by is not a column in the metadata,
+        if len(facets_metadata) > 0:
+            flies_by_facet = partition(allflies, facets_metadata)
+            maxflycount = max(len(f) for f in flies_by_facet.values())
+        else:
+            # None of the facets are columns in the metadata,
             # so we assume that the number of flies in the raster plot
             # is simply the total number of flies.
+            flies_by_facet = None
             maxflycount = len(allflies)
 
+        def facet_flies(facet_values):
+            if flies_by_facet is None:
+                return allflies
+            key = tuple(v for f, v in zip(facets, facet_values)
+                        if f in facets_metadata)
+            if len(key) == 1:
+                key = key[0]
+            return flies_by_facet.get(key, allflies.iloc[:0])
+
         # Initialise the figure.
-        sns.set(style='ticks',context='poster')
-        x_inches = width * col_count
-        y_inches = height * row_count
+        if fig_size is None:
+            fig_size = (width * col_count, height * row_count)
+        else:
+            fig_size = tuple(fig_size)
+            if len(fig_size) != 2:
+                err1 = "`fig_size` should be a (width, height) tuple, "
+                err2 = "but you supplied {}.".format(fig_size)
+                raise ValueError(err1 + err2)
         if ax is None:
             fig, axx = plt.subplots(nrows=row_count, ncols=col_count,
-                                    figsize=(x_inches, y_inches),
+                                    figsize=fig_size,
                                     gridspec_kw={'wspace':0.25,
                                                  'hspace':0.25})
         else:
@@ -265,6 +391,11 @@ class espresso_plotter():
             if palette is None:
                 palette = 'tab10'
             color_pal = plothelp.create_palette(palette, color_groups)
+            # Look up the colour of each category once, as an array that the
+            # category codes of each feed index into. Categories missing from
+            # a custom palette, and feeds without a category, are grey.
+            color_lut = to_rgba_array([color_pal.get(c, 'grey')
+                                       for c in color_groups] + ['grey'])
 
             # Add custom legend and title.
             legend_kwargs = {'frameon': False,
@@ -278,44 +409,30 @@ class espresso_plotter():
 
         else:
             color_pal = None
+            color_lut = None
 
 
         if row is not None and col is not None:
-            INDEX = faceted_feeds.index
-            ROWS = INDEX.get_level_values(row).unique()
-            COLUMNS = INDEX.get_level_values(col).unique()
+            ROWS = allfeeds[row].unique()
+            COLUMNS = allfeeds[col].unique()
             for r, row_ in enumerate(ROWS):
                 for c, col_ in enumerate(COLUMNS):
-                    print("Plotting {} {}".format(row_, col_))
+                    report("Plotting {} {}".format(row_, col_))
                     plot_ax = axx[r, c] # the axes to plot on.
                     # Select the data of interest to plot.
-                    try:
-                        current_facet_feeds = faceted_feeds.loc[col_].loc[row_]
-                        current_facet_flies = faceted_flies.loc[col_].loc[row_]
-                    except TypeError:
-                        # Sometimes there might be an error if one uses an
-                        # integer to index a Categorical index...
-                        # so index step-by-step instead.
-                        _temp_facet_feeds = faceted_feeds.loc[col_]
-                        FEED_INDEX = _temp_facet_feeds.index
-                        current_facet_feeds = _temp_facet_feeds[FEED_INDEX == row_]
-
-                        _temp_facet_flies = faceted_flies.loc[col_]
-                        FLIES_INDEX = _temp_facet_flies.index
-                        current_facet_flies = _temp_facet_flies[FLIES_INDEX == row_]
-
-                    # Get valid feeds.
-                    current_facet_feeds = current_facet_feeds[current_facet_feeds.Valid]
+                    current_facet_feeds = feeds_by_facet.get((col_, row_),
+                                                             no_feeds)
+                    current_facet_flies = facet_flies((col_, row_))
                     self.__plot_rasters(current_facet_feeds, current_facet_flies,
-                                        maxflycount, color_by, color_pal,
+                                        maxflycount, color_by, color_lut,
                                         plot_ax, add_chamberid_labels)
                     plot_ax.set_title("{}; {}".format(col_, row_))
 
         else:
             # We only have one dimension here.
-            plot_dim = [d for d in [row, col] if d is not None][0]
+            plot_dim = facets[0]
             # check how many panels in the single row/column.
-            panels = faceted_feeds.index.get_level_values(plot_dim).unique().tolist()
+            panels = allfeeds[plot_dim].unique().tolist()
             more_than_one_panel = len(panels) > 1
 
             for j, dim_ in enumerate(panels):
@@ -324,12 +441,11 @@ class espresso_plotter():
                     plot_ax = axx[j]
                 else:
                     plot_ax = axx
-                print("Plotting {}".format(dim_))
-                current_facet_feeds = faceted_feeds[(faceted_feeds.index == dim_) &
-                                                    (faceted_feeds.Valid)]
-                current_facet_flies = faceted_flies[faceted_flies.index == dim_]
+                report("Plotting {}".format(dim_))
+                current_facet_feeds = feeds_by_facet.get(dim_, no_feeds)
+                current_facet_flies = facet_flies((dim_,))
                 self.__plot_rasters(current_facet_feeds, current_facet_flies,
-                                    maxflycount, color_by, color_pal,
+                                    maxflycount, color_by, color_lut,
                                     plot_ax, add_chamberid_labels)
                 plot_ax.set_title(dim_)
 
@@ -347,7 +463,11 @@ class espresso_plotter():
                     a.xaxis.grid(**grid_kwargs)
                 plothelp.format_timecourse_xaxis(a, min_x_seconds=start_hour*3600,
                                                  max_x_seconds=end_hour*3600)
-                a.yaxis.set_visible(False)
+                if add_chamberid_labels:
+                    # Keep the ChamberID tick labels, but not the ticks.
+                    a.tick_params(axis='y', which='both', length=0)
+                else:
+                    a.yaxis.set_visible(False)
                 sns.despine(ax=a, **despine_kwargs)
             rasterlegend_ax = axx.flatten()[-1]
 
@@ -356,7 +476,11 @@ class espresso_plotter():
                 axx.xaxis.grid(**grid_kwargs)
             plothelp.format_timecourse_xaxis(axx, min_x_seconds=start_hour*3600,
                                              max_x_seconds=end_hour*3600)
-            axx.yaxis.set_visible(False)
+            if add_chamberid_labels:
+                # Keep the ChamberID tick labels, but not the ticks.
+                axx.tick_params(axis='y', which='both', length=0)
+            else:
+                axx.yaxis.set_visible(False)
             sns.despine(ax=axx, **despine_kwargs)
             rasterlegend_ax = axx
 
@@ -370,6 +494,7 @@ class espresso_plotter():
 
 
 
+    @_poster_style
     def percent_feeding(self, group_by, compare_by,
                         start_hour, end_hour,
                         height=10, width=10,
@@ -424,16 +549,14 @@ class espresso_plotter():
         from matplotlib.patches import Patch
         from matplotlib.lines import Line2D
 
-        from .plot_helpers import compute_percent_feeding, create_palette
         import seaborn as sns
 
-        # make a copy of the metadata and the feedlog.
-        all_feeds = self._experiment.feeds.copy()
-        all_flies = self._experiment.flies.copy()
+        feeds = self._experiment.feeds
+        flies = self._experiment.flies
         facets = [group_by, compare_by]
 
         for z in facets:
-            if z not in all_feeds.columns:
+            if z not in feeds.columns:
                 raise KeyError('{} is not a column in FeedLog. Please check'.format(z))
             # if z not in all_flies.columns:
             #     raise KeyError('{} is not a column in CountLog. Please check'.format(z))
@@ -443,18 +566,29 @@ class espresso_plotter():
             err2 = " It should only be 'row' or 'column'."
             raise ValueError(err1 + err2)
 
-        percent_feeding_summary = compute_percent_feeding(all_feeds, all_flies,
-                                                          facets,
+        # The statistics only depend on the data, the facets and the time
+        # window, so reuse them until the feeds change.
+        cache = self.__cached()
+        key = ('percent_feeding', group_by, compare_by, start_hour, end_hour)
+        if key not in cache:
+            # Only take the columns needed to compute the percentages, rather
+            # than copying the whole metadata and feedlog.
+            attributes = list(dict.fromkeys(facets))
+            all_feeds = feeds.loc[:, ['ChamberID', 'RelativeTime_s', 'Valid',
+                                      'FeedVol_µl', *attributes]]
+            all_flies = flies.loc[:, ['ChamberID',
+                                      *[a for a in attributes
+                                        if a in flies.columns]]]
+            cache[key] = plothelp.compute_percent_feeding(all_feeds,
+                                                          all_flies, facets,
                                                           start_hour=start_hour,
                                                           end_hour=end_hour)
+        percent_feeding_summary = cache[key].copy()
 
         subplots = percent_feeding_summary.index.levels[0].categories
         subplot_title_preface = percent_feeding_summary.index.levels[0].name
 
-        # Set style.
-        sns.set(style='ticks', context="poster")
-
-        palette = create_palette(palette, subplots)
+        palette = plothelp.create_palette(palette, subplots)
 
         # Initialise figure.
         if plot_along == 'column':
@@ -476,7 +610,7 @@ class espresso_plotter():
         legend_elements = []
 
         compareby_groups = percent_feeding_summary.index.levels[1].categories
-        if np.max([len(str(a)) for a in compareby_groups]) > 8:
+        if max(len(str(a)) for a in compareby_groups) > 8:
             rotate_ticks = True
         else:
             rotate_ticks = False
@@ -491,9 +625,9 @@ class espresso_plotter():
 
 
             plot_df = percent_feeding_summary.loc[group_by]
-            cilow = plot_df.ci_lower.tolist()
-            cihigh = plot_df.ci_upper.tolist()
-            ydata = plot_df.percent_feeding.tolist()
+            cilow = plot_df.ci_lower.to_numpy()
+            cihigh = plot_df.ci_upper.to_numpy()
+            ydata = plot_df.percent_feeding.to_numpy()
 
             plot_ax.set_ylim(0, 100)
             # Plot 95CI first.
@@ -508,11 +642,13 @@ class espresso_plotter():
                                               color=plot_color,
                                               alpha=0.25)
 
-            for k, s in enumerate(ydata):
-                plot_ax.plot(k, s, 'o', clip_on=False, color=plot_color)
+            # Plot all the points as a single collection.
+            xpos = np.arange(len(ydata))
+            plot_ax.scatter(xpos, ydata, color=plot_color, clip_on=False,
+                            zorder=3)
 
             # Aesthetic tweaks.
-            plot_ax.xaxis.set_ticks([i for i in range(0,len(plot_df))])
+            plot_ax.set_xticks(xpos)
             plot_ax.xaxis.set_ticklabels(plot_df.index.tolist())
 
             xmax = plot_ax.xaxis.get_ticklocs()[-1]
@@ -609,7 +745,4 @@ class espresso_plotter():
         if tight_layout:
             plt.tight_layout()
 
-        # Reset aesthetics.
-        sns.set()
-
         return f, percent_feeding_summary
@@ -3,21 +3,107 @@
 # Author: Joses Ho
 # Email : joseshowh@gmail.com
 
+from functools import lru_cache as _lru_cache
 
-def normalize_ylims(ax_arr, include_zero=False, draw_zero_line=False):
-    """Custom function to normalize ylims for an array of axes."""
+
+
+def poster_style(plot_function):
+    """
+    Decorator that draws `plot_function` with the seaborn 'ticks' style and
+    'poster' context. The previous matplotlib settings are restored once
+    `plot_function` returns, instead of being reset globally.
+    """
+    from functools import wraps
+
+    @wraps(plot_function)
+    def styled_plot_function(*args, **kwargs):
+        import seaborn as sns
+        with sns.axes_style('ticks'), sns.plotting_context('poster'):
+            return plot_function(*args, **kwargs)
+
+    return styled_plot_function
+
+
+
+def _raster_verts_numpy(starts, ends, rows, maxflycount, verts):
+    """
+    Fills in the (N, 4, 2) vertices `verts` of the raster rectangles for N
+    feeds. Feed i spans `starts[i]` to `ends[i]` on raster row `rows[i]`;
+    the y values are in axes coordinates, with row 0 at the top.
+    """
+    ymin = (1 / maxflycount) * (maxflycount - rows - 1)
+    ymax = (1 / maxflycount) * (maxflycount - rows)
+    verts[:, 0, 0] = starts
+    verts[:, 0, 1] = ymin
+    verts[:, 1, 0] = ends
+    verts[:, 1, 1] = ymin
+    verts[:, 2, 0] = ends
+    verts[:, 2, 1] = ymax
+    verts[:, 3, 0] = starts
+    verts[:, 3, 1] = ymax
+
+
+
+def _raster_verts_loop(starts, ends, rows, maxflycount, verts):
+    """
+    Loop version of `_raster_verts_numpy`, compiled with numba.
+    """
+    height = 1 / maxflycount
+    for i in range(starts.shape[0]):
+        ymin = height * (maxflycount - rows[i] - 1)
+        ymax = height * (maxflycount - rows[i])
+        verts[i, 0, 0] = starts[i]
+        verts[i, 0, 1] = ymin
+        verts[i, 1, 0] = ends[i]
+        verts[i, 1, 1] = ymin
+        verts[i, 2, 0] = ends[i]
+        verts[i, 2, 1] = ymax
+        verts[i, 3, 0] = starts[i]
+        verts[i, 3, 1] = ymax
+
+
+
+@_lru_cache(maxsize=None)
+def _raster_verts_kernel():
+    """
+    Returns `_raster_verts_loop` compiled with numba, or the numpy version
+    if numba is not installed. numba is only imported on first use, so that
+    importing espresso stays light.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return _raster_verts_numpy
+    return njit(nogil=True, cache=True)(_raster_verts_loop)
+
+
+
+def raster_verts(starts, ends, rows, maxflycount):
+    """
+    Returns the (N, 4, 2) vertices of the raster rectangles for N feeds.
+    Feed i spans `starts[i]` to `ends[i]` on raster row `rows[i]`; the
+    y values are in axes coordinates, with row 0 at the top.
+    """
     import numpy as np
 
+    verts = np.empty((starts.shape[0], 4, 2))
+    _raster_verts_kernel()(starts, ends, rows, maxflycount, verts)
+    return verts
+
+
+
+def normalize_ylims(ax_arr, include_zero=False, draw_zero_line=False):
+    """Custom function to normalize ylims for an array of axes."""
     ymins = list()
     ymaxs = list()
 
     for ax in ax_arr:
-        ymin = ax.get_ylim()[0]
-        ymax = ax.get_ylim()[1]
+        ymin, ymax = ax.get_ylim()
         ymins.append(ymin)
         ymaxs.append(ymax)
-    new_min = np.min(ymins)
-    new_max = np.max(ymaxs)
+    # These are short lists of floats; the builtins avoid an array round trip.
+    new_min = min(ymins)
+    new_max = max(ymaxs)
 
     if include_zero:
         if new_max < 0:
@@ -170,8 +256,13 @@ def format_timecourse_xaxis(ax, min_x_seconds, max_x_seconds,
 
 def prep_feeds_for_contrast_plot(feeds, flies, added_labels,
                                 group_by, compare_by, color_by,
-                                start_hour, end_hour):
-    """Convenience function to munge the feeds for contrast plotting."""
+                                start_hour, end_hour, validate=True):
+    """
+    Convenience function to munge the feeds for contrast plotting.
+    Pass `validate=False` to skip checking the columns again.
+
+    Returns the munged DataFrame, and its dabest `idx` (see `contrast_idx`).
+    """
 
     import pandas as pd
     from .._munger import munger as munge
@@ -185,7 +276,8 @@ def prep_feeds_for_contrast_plot(feeds, flies, added_labels,
 
     plot_df = munge.contrast_plot_munger(feeds, flies, added_labels,
                                          group_by, compare_by, color_by,
-                                         start_hour, end_hour)
+                                         start_hour, end_hour,
+                                         validate=validate)
 
     if isinstance(group_by, str):
         to_make_cat = [group_by, compare_by]
@@ -202,7 +294,20 @@ def prep_feeds_for_contrast_plot(feeds, flies, added_labels,
     
     plot_df.loc[:, "plot_groups_with_contrast"] = plot_df.plot_groups_with_contrast.astype(str)
 
-    return plot_df
+    # Every contrast plot made from this frame uses the same idx.
+    return plot_df, contrast_idx(plot_df)
+
+
+
+@_lru_cache(maxsize=64)
+def _named_palette_colors(palette, n_colors):
+    """
+    Returns `n_colors` colors from the matplotlib palette `palette`, as a
+    tuple. Cached, as the same palette is requested on every plot call.
+    """
+    import seaborn as sns
+
+    return tuple(sns.color_palette(palette=palette, n_colors=n_colors))
 
 
 
@@ -214,7 +319,6 @@ def create_palette(palette, plot_groups, produce_colormap=False):
     """
     import matplotlib.pyplot as plt
     from matplotlib.colors import ListedColormap, to_rgb
-    import seaborn as sns
 
     if palette is None:
         palette = 'tab10'
@@ -224,17 +328,11 @@ def create_palette(palette, plot_groups, produce_colormap=False):
             err1 = 'The specified `palette` {}'.format(palette)
             err2 = ' is not a matplotlib palette. Please check.'
             raise ValueError(err1 + err2)
+        colors = _named_palette_colors(palette, len(plot_groups))
         if produce_colormap:
-            palette = ListedColormap(sns.color_palette(
-                                        palette=palette,
-                                        n_colors=len(plot_groups)),
-                                    N=len(plot_groups))
+            palette = ListedColormap(colors, N=len(plot_groups))
         else:
-            palette = dict(zip(plot_groups,
-                               sns.color_palette(palette=palette,
-                                                 n_colors=len(plot_groups))
-                              )
-                           )
+            palette = dict(zip(plot_groups, colors))
 
     elif isinstance(palette, list):
         if len(plot_groups) != len(palette):
@@ -322,18 +420,32 @@ def get_new_prefix(unit):
 
 
 
-def dabest_parser(plot_df, yvar):
-
+def contrast_idx(plot_df):
+    """
+    Returns the dabest `idx` for a munged contrast plot DataFrame: a list
+    with one tuple of `plot_groups_with_contrast` per plot group.
+    """
     import numpy as np
+    import pandas as pd
+
+    unique_ids = pd.unique(plot_df.plot_groups_with_contrast.to_numpy())
+    group_count = len(pd.unique(plot_df.plot_groups.to_numpy()))
+    split_idxs = np.array_split(unique_ids, group_count)
+    return [tuple(i) for i in split_idxs]
+
+
+
+def dabest_parser(plot_df, yvar, idx=None):
+
     import dabest
     from .._munger import munger as munge
     import warnings
     # warnings.filterwarnings("ignore", module='mpl_toolkits')
 
-    # Properly arrange idx for grouping.
-    unique_ids = plot_df.plot_groups_with_contrast.unique()
-    split_idxs = np.array_split(unique_ids, len(plot_df.plot_groups.unique()))
-    idx = [tuple(i) for i in split_idxs]
+    # Properly arrange idx for grouping, unless it was worked out already
+    # by `prep_feeds_for_contrast_plot`.
+    if idx is None:
+        idx = contrast_idx(plot_df)
     
     out = dabest.load(plot_df, x='plot_groups_with_contrast', y=yvar, idx=idx)
     return out
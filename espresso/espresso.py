@@ -27,15 +27,25 @@ class espresso(object):
         Enter the (longest) experiment duration here in minutes. This should
         accurately reflect the actual duration. You will be able to fliter for
         time windows in specific plots later.
+
+    max_workers: integer, default 4
+        The number of threads used to read in and munge the feedlogs. If 1,
+        they are munged one after the other.
+
+    fast_io: boolean, default False
+        If True, and pyarrow is installed, the CSVs are parsed with pyarrow's
+        multithreaded CSV reader instead of the default pandas reader.
     """
 
 
 
-    def __init__(self, folder, expt_duration_minutes):
+    def __init__(self, folder, expt_duration_minutes, max_workers=4,
+                 fast_io=False):
         import warnings
         warnings.filterwarnings("ignore", category=RuntimeWarning)
 
         import os
+        from concurrent.futures import ThreadPoolExecutor
 
         import numpy as np
         import pandas as pd
@@ -46,10 +56,7 @@ class espresso(object):
 
         self.version = '0.7.3'
 
-        allflies = []
-        allfeeds = []
-        allmetadata = []
-        non_feeding_flies = []
+        non_feeding_flies = set()
 
         files = os.listdir(folder)
         self.feedlogs = [csv for csv in files
@@ -60,7 +67,6 @@ class espresso(object):
         # Prepare variables.
         feedlogs_list = list()
         metadata_list = list()
-        expt_durations = list()
 
         # check that each feedlog has a corresponding metadata CSV
         for feedlog in feedlogs_in_folder:
@@ -74,57 +80,60 @@ class espresso(object):
 
         self.expt_duration_minutes = expt_duration_minutes
 
-        for j, feedlog in enumerate(feedlogs_in_folder):
-            datetime_exptname = '_'.join(feedlog.strip('.csv').split('_')[1:3])
+        # Each feedlog is read and munged independently, so munge them
+        # concurrently. Threads rather than processes: the CSV parsing
+        # releases the GIL, and the munged frames need not be pickled back.
+        def munge_one(feedlog):
+            return munge.munge_feedlog_and_metadata(folder, feedlog,
+                                                    fast_io=fast_io)
 
-            # Read in metadata.
-            path_to_metadata = os.path.join(folder, feedlog.replace('FeedLog',
-                                                                    'MetaData'))
-            metadata_csv = munge.metadata(path_to_metadata)
-            metadata_csv['ChamberID'] = datetime_exptname + '_Chamber' + \
-                                        metadata_csv.ID.astype(str)
+        if max_workers == 1 or len(feedlogs_in_folder) < 2:
+            munged = [munge_one(feedlog) for feedlog in feedlogs_in_folder]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                munged = list(executor.map(munge_one, feedlogs_in_folder))
 
+        for metadata_csv, feedlog_csv, non_feeders in munged:
             # Save the munged metadata.
             metadata_list.append(metadata_csv)
-            # Save the fly IDs.
-            allflies.append(metadata_csv.loc[:,'ChamberID'].copy())
-
-            # Read in feedlog.
-            path_to_feedlog = os.path.join(folder,feedlog)
-            feedlog_csv = munge.feedlog(path_to_feedlog)
-            feedlog_csv.loc[:,'ChamberID'] = datetime_exptname + '_Chamber' + feedlog_csv.ChamberID.astype(str)
-
-            # Detect non-feeding flies, add to the appropriate list.
-            non_feeding_flies = non_feeding_flies + munge.detect_non_feeding_flies(metadata_csv,
-                feedlog_csv)
 
-            # Add columns in nanoliters.
-            feedlog_csv = munge.compute_nanoliter_cols(feedlog_csv)
-            # Add columns for RelativeTime_s and FeedDuration_s.
-            feedlog_csv = munge.compute_time_cols(feedlog_csv)
+            # Add the non-feeding flies to the appropriate set.
+            non_feeding_flies.update(non_feeders)
 
             # Save the munged feedlog.
             feedlogs_list.append(feedlog_csv)
 
 
         # Join all processed feedlogs and metadata into respective DataFrames.
-        allflies = pd.concat(metadata_list, sort=True)
-        allfeeds = pd.concat(feedlogs_list, sort=True)
+        allflies = pd.concat(metadata_list, sort=True,
+                             ignore_index=True, copy=False)
+        allfeeds = pd.concat(feedlogs_list, sort=True,
+                             ignore_index=True, copy=False)
+
+        # Add columns in nanoliters, for all feedlogs at once.
+        allfeeds = munge.compute_nanoliter_cols(allfeeds)
+        # Add columns for RelativeTime_s and FeedDuration_s.
+        allfeeds = munge.compute_time_cols(allfeeds)
+        # Sort the columns alphabetically, as they were when these columns
+        # were added before the concat.
+        allfeeds.sort_index(axis=1, inplace=True)
 
         # Assign feed choice to the allfeeds DataFrame.
         food_choice_cols = allflies.filter(regex='Tube').columns.tolist()
         food_choice_cols.append('ChamberID')
 
-        food_choice_df = allflies[food_choice_cols]
-        food_choice_df.set_index('ChamberID', inplace=True)
-        allfeeds['FoodChoice'] = allfeeds.apply(lambda x:
-                                    munge.assign_food_choice(x['ChamberID'],
-                                                             x['ChoiceIdx']+1,
-                                                             food_choice_df),
-                                    axis=1)
+        food_choice_df = allflies[food_choice_cols].set_index('ChamberID')
+        # Build FoodChoice as a sorted Categorical of the tubes in one go.
+        food_choices = munge.assign_food_choices(allfeeds, food_choice_df)
+        tubes = pd.unique(food_choice_df.to_numpy().ravel())
+        tubes = np.sort(tubes[~pd.isna(tubes)])
+        allfeeds['FoodChoice'] = pd.Categorical(food_choices,
+                                                categories=tubes, ordered=True)
 
         # Drop row if unable to assign feed choice to the row.
         allfeeds.dropna(axis=0, how='any', inplace=True)
+        allfeeds['FoodChoice'] = \
+                    allfeeds.FoodChoice.cat.remove_unused_categories()
 
         # Define 2 padrows per fly, per food choice (in this case, only one),
         # that will ensure feedlogs for each ChamberID fully capture the entire
@@ -132,13 +141,6 @@ class espresso(object):
         allfeeds = munge.add_padrows(allflies, allfeeds,
                                      expt_duration_minutes*60)
 
-        # Turn Food Choice into categorical.
-        food_choice_col = allfeeds.FoodChoice
-        food_choices = np.sort(food_choice_col.dropna().unique())
-        allfeeds.loc[:, "FoodChoice"] = pd.Categorical(food_choice_col,
-                                                       categories=food_choices,
-                                                       ordered=True)
-
         # rename columns and types as is appropriate.
         allflies.loc[:,'Genotype'] = allflies.Genotype.str.replace('W','w')
         allflies.loc[:,'Genotype'] = allflies.Genotype.str.replace('iii','111')
@@ -167,17 +169,11 @@ class espresso(object):
         # Compute average feed speed per fly in chamber, for each feed.
         allfeeds = munge.average_feed_speed_per_fly(allfeeds)
 
-        # Reset the indexes.
-        allflies.reset_index(drop=True, inplace=True)
-        allfeeds.reset_index(drop=True, inplace=True)
-
         # Sort by ChamberID, then by RelativeTime
         allfeeds.sort_values(['ChamberID', 'RelativeTime_s'], inplace=True)
 
         # Record which flies did not feed.
-        allflies['AtLeastOneFeed'] = np.repeat(True,len(allflies))
-        non_feeding_flies_idx = allflies[allflies.ChamberID.isin(non_feeding_flies)].index
-        allflies.loc[non_feeding_flies_idx, 'AtLeastOneFeed'] = False
+        allflies['AtLeastOneFeed'] = ~allflies.ChamberID.isin(non_feeding_flies)
 
 
         self.flies = allflies
@@ -190,9 +186,14 @@ class espresso(object):
         self.genotypes = allflies.Genotype.unique()
         self.temperatures = allflies.Temperature.unique()
         self.sexes = allflies.Sex.unique()
+        self.statuses = allflies.Status.unique()
         self.foodtypes = allfeeds.FoodChoice.unique()
         self.chamber_fly_counts = allfeeds.FlyCountInChamber.unique()
 
+        # Bumped whenever `feeds` is modified, so plotters know to discard
+        # anything they have munged from it.
+        self._feeds_version = 0
+
         # Passes an instance of `self` to plotter.
         self.plot = espresso_plotter.espresso_plotter(self)
 
@@ -200,7 +201,11 @@ class espresso(object):
 
     def __repr__(self):
 
-        statuses = self.flies.Status.unique()
+        try:
+            statuses = self.statuses
+        except AttributeError:
+            # espresso objects saved before `statuses` was kept.
+            statuses = self.flies.Status.unique()
         plural_list = []
 
         for value in [self.feedlog_count, len(self.genotypes),
@@ -287,37 +292,42 @@ class espresso(object):
 
     def __add__(self, other):
 
-        from copy import copy as deepcopy
-        import numpy as np
+        from copy import copy
         import pandas as pd
         from ._plotter import espresso_plotter as espresso_plotter
         from ._munger import munger as munge
 
-        # Create a copy of the first espresso object to be summed.
-        self_copy = deepcopy(self)
-        # Create a copy of the other espresso object.
-        other_copy = deepcopy(other)
-
-        # Make sure the `AtLeastOneFeed` column in both .flies is a boolean.
-        for df in [self_copy.flies, self_copy.flies]:
-            df.loc[:, 'AtLeastOneFeed'] = df.AtLeastOneFeed.astype('bool')
-
-        # Make sure the `Valid` column in both .feeds is a boolean too.
-        for df in [self_copy.feeds, self_copy.feeds]:
-            df.loc[:, 'Valid'] = df.Valid.astype('bool')
-
-        # Merge the flies and feeds attributes.
-        self_copy.flies = pd.merge(self_copy.flies, other_copy.flies,
-            how='outer')
-        self_copy.feeds = pd.merge(self_copy.feeds, other_copy.feeds,
-            how='outer')
+        # A shallow copy carries over the scalar attributes; `flies` and
+        # `feeds` are replaced below, so their data is never copied twice.
+        self_copy = copy(self)
+
+        # Stack the flies and feeds of both experiments. Both share the same
+        # columns, so there is nothing to join on. Rows found in both (eg. an
+        # experiment added to itself) are only kept once.
+        self_copy.flies = pd.concat([self.flies, other.flies],
+                                    ignore_index=True, sort=False)
+        self_copy.flies.drop_duplicates(inplace=True)
+        self_copy.flies.reset_index(drop=True, inplace=True)
+
+        self_copy.feeds = pd.concat([self.feeds, other.feeds],
+                                    ignore_index=True, sort=False)
+        self_copy.feeds.drop_duplicates(inplace=True)
+        self_copy.feeds.sort_values(['ChamberID', 'RelativeTime_s'],
+                                    inplace=True)
+        self_copy.feeds.reset_index(drop=True, inplace=True)
+
+        # Make sure the `AtLeastOneFeed` column in .flies is a boolean,
+        # and the `Valid` column in .feeds is a boolean too.
+        self_copy.flies['AtLeastOneFeed'] = \
+                                self_copy.flies.AtLeastOneFeed.astype('bool')
+        self_copy.feeds['Valid'] = self_copy.feeds.Valid.astype('bool')
 
         # carry over the original_labels attrib.
         self_copy.flies_original_labels = self.flies_original_labels
         self_copy.feeds_original_labels = self.feeds_original_labels
 
         new_labels = []
-        for o in [self_copy, other_copy]:
+        for o in [self, other]:
             if hasattr(o, "added_labels"):
                 if isinstance(o.added_labels, list):
                     new_labels = new_labels + o.added_labels
@@ -329,19 +339,17 @@ class espresso(object):
         else:
             added_labels = None
 
-        self_copy.feedlogs = list(set(self_copy.feedlogs + other_copy.feedlogs))
+        self_copy.feedlogs = list(set(self.feedlogs + other.feedlogs))
         self_copy.feedlog_count = len(self_copy.feedlogs)
 
         munge.make_categorical_columns(self_copy.flies, added_labels)
         self_copy.genotypes = self_copy.flies.Genotype.unique()
         self_copy.temperatures = self_copy.flies.Temperature.unique()
         self_copy.sexes = self_copy.flies.Sex.unique()
+        self_copy.statuses = self_copy.flies.Status.unique()
 
-        food_choice_col = self_copy.feeds.FoodChoice
-        food_choices = np.sort(food_choice_col.dropna().unique())
-        self_copy.feeds.loc[:, "FoodChoice"] = pd.Categorical(food_choice_col,
-                                                       categories=food_choices,
-                                                       ordered=True)
+        self_copy.feeds.loc[:, "FoodChoice"] = munge.to_sorted_categorical(
+                                                self_copy.feeds.FoodChoice)
 
         munge.make_categorical_columns(self_copy.feeds, added_labels)
         self_copy.foodtypes = self_copy.feeds.FoodChoice.unique()
@@ -386,6 +394,8 @@ class espresso(object):
         import numpy as np
         import pandas as pd
 
+        from ._munger import munger as munge
+
         # Sanity check for keywords passed.
         label_name = str(label_name)
 
@@ -398,10 +408,12 @@ class espresso(object):
 
         if label_value is not None:
             for obj in [self.flies, self.feeds]:
-                newcol = pd.Series(np.repeat(str(label_value), len(obj)))
-                # turn into Categorical.
-                obj[label_name] = pd.Categorical(newcol, ordered=True,
-                                                 categories=newcol.unique())
+                # Every row has the same value, so build the Categorical
+                # straight from its (all zero) codes.
+                obj[label_name] = pd.Categorical.from_codes(
+                                        np.zeros(len(obj), dtype=np.int8),
+                                        categories=[str(label_value)],
+                                        ordered=True)
 
         else:
             for col in label_from_cols:
@@ -410,16 +422,13 @@ class espresso(object):
                     raise KeyError( "{0} is not found in the metadata. Please check.".format(col) )
 
             for obj in [self.flies, self.feeds]:
-                # See https://stackoverflow.com/questions/33098383/merge-multiple-column-values-into-one-column-in-python-pandas
-                newcol = obj[label_from_cols].apply(
-                                         lambda x: sep.join(
-                                                    x.dropna().astype(str)
-                                                    ), axis = 1)
+                newcol = munge.join_label_cols(obj, label_from_cols, sep=sep)
                 # turn into Categorical.
                 obj[label_name] = pd.Categorical(newcol, ordered=True,
-                                                 categories=newcol.unique())
+                                                 categories=pd.unique(newcol))
 
         labels=[label_name] # convert to single-member list.
+        self._feeds_version = getattr(self, '_feeds_version', 0) + 1
         if hasattr(self, 'added_labels'):
             self.added_labels.extend(labels)
         else:
@@ -450,17 +459,19 @@ class espresso(object):
         if isinstance(labels, str):
             labels = [labels] # convert to single-member list.
 
-        if isinstance(labels,list):
-            in_added = [str(l) for l in labels if l in self.added_labels]
-
-            if len(in_added) == 0:
-                raise KeyError("Not all labels in {0} is not an added label. Please check.".format(labels))
+        added_set = set(self.added_labels)
+        missing = [l for l in labels if l not in added_set]
+        if len(missing) > 0:
+            err1 = "{0} in {1} ".format(missing, labels)
+            err2 = "are not added labels. Please check."
+            raise KeyError(err1 + err2)
 
         self.flies.drop(labels,axis = 1,inplace = True)
         self.feeds.drop(labels,axis = 1,inplace = True)
+        self._feeds_version = getattr(self, '_feeds_version', 0) + 1
 
         # check if we need to remove the added_labels attribute.
-        if labels == self.added_labels:
+        if set(labels) == added_set:
             del self.__dict__['added_labels']
         else:
             for l in labels:
@@ -482,6 +493,7 @@ class espresso(object):
 
         for attr in [self.flies, self.feeds]:
             attr.drop(dropped,axis = 1,inplace = True)
+        self._feeds_version = getattr(self, '_feeds_version', 0) + 1
 
         del self.__dict__['added_labels']
 
@@ -493,8 +505,9 @@ class espresso(object):
         import pickle as pk
 
         with open(filename, 'wb') as f:
-            # To ensure compatibility with Py2, set protocol = 2
-            pk.dump(self, f, protocol = 2)
+            # Use the highest protocol available; protocol 5 pickles the
+            # DataFrames' array buffers far more efficiently than protocol 2.
+            pk.dump(self, f, protocol = pk.HIGHEST_PROTOCOL)
 
 
 